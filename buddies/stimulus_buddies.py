@@ -111,6 +111,14 @@ class StimulusBuddy(DirectObject.DirectObject):
             self._stimulus = newstimulus
             self._stimChange = True
 
+    def report(self, newposition, newstimulus):
+        """
+        per-frame update: track position and stimulus, then broadcast
+        """
+        self.position(newposition)
+        self.stimulus(newstimulus)
+        self.broadcaster()
+
     def broadcaster(self):
         match self.reportingMethod:
             case "onStim":
@@ -11,21 +11,190 @@ Example Classes given as TexMoving and BinocularMoving -- use a sequencer for ex
 Part of pandastim package: https://github.com/mattdloring/pandastim
 """
 import json
+import logging
+import math
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 from direct.gui.OnscreenText import OnscreenText  # for binocular stim
 from direct.showbase import ShowBaseGlobal
 from direct.showbase.ShowBase import ShowBase
-from direct.task import Task
-from panda3d.core import (CardMaker, ClockObject, ColorBlendAttrib,
+from panda3d.core import (CardMaker, ClockObject, ColorBlendAttrib, NodePath,
                           PStatClient, Texture, TextureStage, TransformState,
                           WindowProperties)
 
 from pandastim import utils
 from pandastim.stimuli import stimulus_details
+# by name for the example classes, their stimulus_details argument shadows the module
+from pandastim.stimuli.stimulus_details import (BinocularStimulusDetails,
+                                                MonocularStimulusDetails)
+
+# card scale for the example classes, big enough to cover the window under any rotation
+_SQRT8 = math.sqrt(8)
+
+# binocular masks keyed on their geometry, shared across stimuli and instances
+_mask_cache = {}
+
+
+def binocular_masks(left_size, right_size, strip_width, projecting_fish=False):
+    """
+    builds the left and right half-field mask arrays and their uploaded textures
+
+    masks only depend on the texture sizes and the strip, so each geometry is built once
+    equal sized masks share one luminance-alpha texture: left in luminance, right in alpha
+    :return: left_mask_array, right_mask_array, left_mask, right_mask
+    """
+    key = (tuple(left_size), tuple(right_size), strip_width, projecting_fish)
+    if key in _mask_cache:
+        return _mask_cache[key]
+
+    # masks are constant down the columns: fill one row each and broadcast it
+    left_row = np.zeros(left_size[1], dtype=np.uint8)
+    left_row[: (left_size[1] // 2) - strip_width // 2] = 255
+    left_mask_array = np.broadcast_to(left_row, (left_size[0], left_size[1]))
+
+    right_row = np.zeros(right_size[1], dtype=np.uint8)
+    right_row[(right_size[1] // 2) + strip_width // 2 :] = 255
+    right_mask_array = np.broadcast_to(right_row, (right_size[0], right_size[1]))
+
+    if projecting_fish:
+        # the marks need writable full size masks
+        left_mask_array = left_mask_array.copy()
+        right_mask_array = right_mask_array.copy()
+        ### DANGER ZONE ###
+        ### currently assumes 1024 textures ###
+        left_mask_array[506:515, 511:512] = 120
+        right_mask_array[506:515, 512:513] = 120
+        left_mask_array[514:516, 510:512] = 255
+        right_mask_array[514:516, 512:514] = 255
+        ### END DANGER ZONE ###
+        left_image, right_image = left_mask_array, right_mask_array
+    else:
+        # without the marks the masks are column-constant, so only one row is uploaded
+        left_image, right_image = left_row[None, :], right_row[None, :]
+
+    if left_mask_array.shape == right_mask_array.shape:
+        # one upload and one gpu texture for both sides
+        left_mask = right_mask = Texture("binocular_mask_texture")
+        left_mask.setup2dTexture(
+            left_image.shape[1],
+            left_image.shape[0],
+            Texture.T_unsigned_byte,
+            Texture.F_luminance_alpha,
+        )
+        left_mask.setRamImage(np.stack([left_image, right_image], axis=-1))
+        utils.async_transfer(left_mask)
+    else:
+        left_mask = Texture("left_mask_texture")
+        left_mask.setup2dTexture(
+            left_image.shape[1],
+            left_image.shape[0],
+            Texture.T_unsigned_byte,
+            Texture.F_luminance,
+        )
+        left_mask.setRamImage(left_image)
+        utils.async_transfer(left_mask)
+
+        right_mask = Texture("right_mask_texture")
+        right_mask.setup2dTexture(
+            right_image.shape[1],
+            right_image.shape[0],
+            Texture.T_unsigned_byte,
+            Texture.F_luminance,
+        )
+        right_mask.setRamImage(right_image)
+        utils.async_transfer(right_mask)
+
+    _mask_cache[key] = left_mask_array, right_mask_array, left_mask, right_mask
+    return _mask_cache[key]
+
+
+@lru_cache(maxsize=None)
+def modulate_stage(name, keep_alpha=False):
+    """
+    texture stage that multiplies its texture into the stages below it
+
+    stages are configured once per name and shared after that
+    :param keep_alpha: pass the alpha of the stages below through untouched
+    """
+    stage = TextureStage(name)
+    stage.setCombineRgb(
+        TextureStage.CMModulate,
+        TextureStage.CSTexture,
+        TextureStage.COSrcColor,
+        TextureStage.CSPrevious,
+        TextureStage.COSrcColor,
+    )
+    if keep_alpha:
+        stage.setCombineAlpha(
+            TextureStage.CMReplace, TextureStage.CSPrevious, TextureStage.COSrcAlpha
+        )
+    return stage
+
+
+def bind_texture(card, texture_stage, texture):
+    """
+    puts texture on the card's stage, unless it is already there
+
+    the cards and their stages are reused across stimuli, and rebinding the same
+    texture would still rebuild the card's render state
+    """
+    if card.getTexture(texture_stage) != texture:
+        card.setTexture(texture_stage, texture)
+
+
+def mask_transform(pos, strip_angle, inv_scale):
+    """
+    translate(0.5, 0.5) . rotate . scale . translate(-pos) built as a single state
+
+    rotation and scale are about the origin, so their effect on the shift is folded
+    into the final translation instead of composing four states
+    """
+    cos, sin = math.cos(math.radians(strip_angle)), math.sin(math.radians(strip_angle))
+    shift_u, shift_v = -pos[0] * inv_scale, -pos[1] * inv_scale
+    return TransformState.makePosRotateScale2d(
+        (0.5 + shift_u * cos - shift_v * sin, 0.5 + shift_u * sin + shift_v * cos),
+        strip_angle,
+        (inv_scale, inv_scale),
+    )
+
+
+def drift_offset(time, velocity):
+    """
+    texture offset after drifting at velocity for time, wrapped into one period
+
+    the texture repeats every unit of offset, wrapping keeps the float32 offset precise
+    """
+    return -(time * velocity % 1)  # negative b/c texture stage
+
+
+def task_thresholds(stationary_time, duration, hold_after):
+    """
+    stimulus timing as plain floats for the per-frame checks
+
+    a duration of -1 (forever) and a nan hold_after become inf, so they never trigger
+    the stimulus moves for stationary_time < t < moving_until, a single check per frame
+    :return: stationary_time, end_time, hold_after, moving_until
+    """
+    end_time = math.inf if duration == -1 else float(duration)
+    hold_after = math.inf if math.isnan(hold_after) else float(hold_after)
+    return float(stationary_time), end_time, hold_after, min(end_time, hold_after)
+
+
+def open_window(base, window_properties):
+    """
+    opens the main window of a showbase started with windowType="none"
+
+    the window is created with its final properties instead of opening at the
+    default size and being resized/retitled once it is up
+    """
+    props = WindowProperties.getDefault()
+    props.addProperties(window_properties)
+    base.windowType = base.config.GetString("window-type", "onscreen")
+    base.openDefaultWindow(props=props)
 
 
 class StimulusSequencing(ShowBase):
@@ -39,7 +208,8 @@ class StimulusSequencing(ShowBase):
     """
 
     def __init__(self, stimuli=None, params_path="default", buddy=None):
-        super().__init__()
+        # the window is opened in format_window, once its properties are known
+        super().__init__(windowType="none")
 
         self.stimuli = stimuli
 
@@ -51,10 +221,69 @@ class StimulusSequencing(ShowBase):
         self.load_params(params_path)
         self.format_window()
         self.enable_params()
+        self.build_cards()
+        self.prepare_textures()
 
         self.current_stimulus = None
         self.running = True
 
+    def build_cards(self):
+        """
+        builds the monocular and binocular cards and their texture stages once
+
+        stimuli only swap textures and transforms on these, and show / hide them
+        """
+        cardmaker = CardMaker("stimcard")
+        cardmaker.setFrameFullscreenQuad()
+        # one quad instanced under each card, render state lives on the card nodes
+        card_geom = NodePath(cardmaker.generate())
+
+        ## MONOCULAR ##
+        self.texture_stage = TextureStage("texture_stage")
+
+        self.card = self.aspect2d.attachNewNode("card")
+        card_geom.instanceTo(self.card)
+        self.card.setScale(self.scale)
+        self.card.setColor((1, 1, 1, 1))
+        self.card.hide()
+
+        ## BINOCULAR ##
+        self.left_texture_stage = TextureStage("left_texture_stage")
+        # Multiply the texture stages together, alpha is left to the texture below
+        self.left_mask_stage = modulate_stage("left_mask_array", keep_alpha=True)
+
+        self.right_texture_stage = TextureStage("right_texture_stage")
+        self.right_mask_stage = TextureStage("right_mask_stage")
+        # rgb combine depends on the masks, it is set per stimulus
+        self.right_mask_stage.setCombineAlpha(
+            TextureStage.CMReplace, TextureStage.CSPrevious, TextureStage.COSrcAlpha
+        )
+
+        self.left_card = self.aspect2d.attachNewNode("left_card")
+        card_geom.instanceTo(self.left_card)
+        self.left_card.setAttrib(ColorBlendAttrib.make(ColorBlendAttrib.M_add))
+        self.left_card.hide()
+        self.right_card = self.aspect2d.attachNewNode("right_card")
+        card_geom.instanceTo(self.right_card)
+        self.right_card.setAttrib(ColorBlendAttrib.make(ColorBlendAttrib.M_add))
+        self.right_card.hide()
+
+    def prepare_textures(self):
+        """
+        queue every known stimulus texture for upload ahead of its onset
+        """
+        known_stimuli = list(self.stimuli or [])
+        if self.buddy:
+            known_stimuli += self.buddy.queue
+
+        prepared_objects = self.win.getGsg().getPreparedObjects()
+        for stimulus in known_stimuli:
+            if isinstance(stimulus.texture, tuple):
+                for texture in stimulus.texture:
+                    texture.texture.prepare(prepared_objects)
+            else:
+                stimulus.texture.texture.prepare(prepared_objects)
+
     def set_stimulus(self):
         # match stimulus to stimulus details type
         match self.current_stimulus:
@@ -65,52 +294,50 @@ class StimulusSequencing(ShowBase):
             case None:
                 pass
             case _:
-                print(
+                logging.warning(
                     f"{self.current_stimulus.__class__} -- Stimulus type not understood"
                 )
 
     def set_monocular(self):
-        cardmaker = CardMaker("stimcard")
-        cardmaker.setFrameFullscreenQuad()
-
-        # create tex stage
-        self.texture_stage = TextureStage("texture_stage")
-
-        # create card
-        self.card = self.aspect2d.attachNewNode(cardmaker.generate())
-        self.card.setScale(self.scale)
-        self.card.setColor((1, 1, 1, 1))
-
-        self.card.setTexture(self.texture_stage, self.current_stimulus.texture.texture)
+        bind_texture(
+            self.card, self.texture_stage, self.current_stimulus.texture.texture
+        )
 
-        # set tex transforms
-        self.card.setTexRotate(
+        # set tex transforms, rotation and offset composed into one state
+        self.card.setTexTransform(
             self.texture_stage,
-            self.current_stimulus.angle + self.default_params["rotation_offset"],
+            TransformState.makePosRotate2d(
+                (self.center_x, self.center_y),
+                self.current_stimulus.angle + self.rotation_offset,
+            ),
         )
-        self.card.setTexPos(self.texture_stage, self.center_x, self.center_y, 0)
+        self.card.show()
+
+        (
+            self._stationary_time,
+            self._end_time,
+            self._hold_after,
+            self._moving_until,
+        ) = task_thresholds(
+            self.current_stimulus.stationary_time,
+            self.current_stimulus.duration,
+            self.current_stimulus.hold_after,
+        )
+        self._velocity = self.current_stimulus.velocity
         self.taskMgr.add(self.move_monocular, "move_monocular")
 
     def move_monocular(self, move_monocular_task):
-        if move_monocular_task.time <= self.current_stimulus.stationary_time:
-            # self.new_position = 0
-            pass
-        elif move_monocular_task.time >= self.current_stimulus.duration != -1:
-            self.clear_cards()
-            self.new_position = 0
-            return move_monocular_task.done
-        elif (
-            not np.isnan(self.current_stimulus.hold_after)
-            and move_monocular_task.time >= self.current_stimulus.hold_after
-        ):
-            pass
-        else:
-            self.new_position = (
-                -move_monocular_task.time
-            ) * self.current_stimulus.velocity
+        time = move_monocular_task.time
+        if self._stationary_time < time < self._moving_until:
+            self.new_position = -time * self._velocity
             self.card.setTexPos(
                 self.texture_stage, self.new_position + self.center_x, self.center_y, 0
             )  # u, v, w
+        elif time > self._stationary_time and time >= self._end_time:
+            self.clear_cards()
+            self.new_position = 0
+            return move_monocular_task.done
+        # otherwise still stationary, or holding after the motion
         return move_monocular_task.cont
 
     def set_binocular(self):
@@ -123,84 +350,42 @@ class StimulusSequencing(ShowBase):
         tex_1 = self.current_stimulus.texture[0].texture
         tex_2 = self.current_stimulus.texture[1].texture
 
-        ## CREATE TEXTURE STAGES ##
-        self.left_texture_stage = TextureStage("left_texture_stage")
-        self.left_mask = Texture("left_mask_texture")
-        self.left_mask.setup2dTexture(
-            tex_1_size[0], tex_1_size[1], Texture.T_unsigned_byte, Texture.F_luminance
+        # CREATE MASKS (cached, repeated geometries are neither rebuilt nor re-uploaded)
+        (
+            self.left_mask_array,
+            self.right_mask_array,
+            self.left_mask,
+            self.right_mask,
+        ) = binocular_masks(
+            tex_1_size,
+            tex_2_size,
+            self.current_stimulus.strip_width,
+            self.default_params["projecting_fish"],
         )
-        self.left_mask_stage = TextureStage("left_mask_array")
-
-        self.right_texture_stage = TextureStage("right_texture_stage")
-        self.right_mask = Texture("right_mask_texture")
-        self.right_mask.setup2dTexture(
-            tex_2_size[0], tex_2_size[1], Texture.T_unsigned_byte, Texture.F_luminance
-        )
-        self.right_mask_stage = TextureStage("right_mask_stage")
-
-        ## CREATE CARDS ###
-        cardmaker = CardMaker("stimcard")
-        cardmaker.setFrameFullscreenQuad()
-
-        self.setBackgroundColor((0, 0, 0, 1))
-        self.left_card = self.aspect2d.attachNewNode(cardmaker.generate())
-        self.left_card.setAttrib(ColorBlendAttrib.make(ColorBlendAttrib.M_add))
-        self.right_card = self.aspect2d.attachNewNode(cardmaker.generate())
-        self.right_card.setAttrib(ColorBlendAttrib.make(ColorBlendAttrib.M_add))
-
-        # CREATE MASK ARRAYS
-        self.left_mask_array = 255 * np.ones(
-            (tex_1_size[0], tex_1_size[1]), dtype=np.uint8
-        )
-        self.left_mask_array[
-            :, (tex_1_size[1] // 2) - self.current_stimulus.strip_width // 2 :
-        ] = 0
-
-        self.right_mask_array = 255 * np.ones(
-            (tex_2_size[0], tex_2_size[1]), dtype=np.uint8
-        )
-        self.right_mask_array[
-            :, : (tex_2_size[1] // 2) + self.current_stimulus.strip_width // 2
-        ] = 0
-
-        if self.default_params["projecting_fish"]:
-            ### DANGER ZONE ###
-            ### currently assumes 1024 textures ###
-            self.left_mask_array[506:515, 511:512] = 120
-            self.right_mask_array[506:515, 512:513] = 120
-            self.left_mask_array[514:516, 510:512] = 255
-            self.right_mask_array[514:516, 512:514] = 255
-            ### END DANGER ZONE ###
 
         # ADD TEXTURE STAGES TO CARDS
-        self.left_mask.setRamImage(self.left_mask_array)
-        self.left_card.setTexture(self.left_texture_stage, tex_1)
-
-        # Multiply the texture stages together
-        self.left_mask_stage.setCombineRgb(
-            TextureStage.CMModulate,
-            TextureStage.CSTexture,
-            TextureStage.COSrcColor,
-            TextureStage.CSPrevious,
-            TextureStage.COSrcColor,
-        )
-
-        self.left_card.setTexture(self.left_mask_stage, self.left_mask)
+        bind_texture(self.left_card, self.left_texture_stage, tex_1)
+        bind_texture(self.left_card, self.left_mask_stage, self.left_mask)
 
         # ADD TEXTURE STAGES TO CARDS
-        self.right_mask.setRamImage(self.right_mask_array)
-        self.right_card.setTexture(self.right_texture_stage, tex_2)
-
-        # Multiply the texture stages together
-        self.right_mask_stage.setCombineRgb(
-            TextureStage.CMModulate,
-            TextureStage.CSTexture,
-            TextureStage.COSrcColor,
-            TextureStage.CSPrevious,
-            TextureStage.COSrcColor,
+        bind_texture(self.right_card, self.right_texture_stage, tex_2)
+
+        # Multiply the texture stages together, a shared mask holds this side in alpha
+        # changing a stage's combiner dirties every state using it, so only on change
+        right_mask_operand = (
+            TextureStage.COSrcAlpha
+            if self.right_mask is self.left_mask
+            else TextureStage.COSrcColor
         )
-
-        self.right_card.setTexture(self.right_mask_stage, self.right_mask)
+        if self.right_mask_stage.getCombineRgbOperand0() != right_mask_operand:
+            self.right_mask_stage.setCombineRgb(
+                TextureStage.CMModulate,
+                TextureStage.CSTexture,
+                right_mask_operand,
+                TextureStage.CSPrevious,
+                TextureStage.COSrcColor,
+            )
+        bind_texture(self.right_card, self.right_mask_stage, self.right_mask)
 
         ### Do the transform things ###
         self.mask_transform = self.trs_transform()
@@ -219,91 +404,96 @@ class StimulusSequencing(ShowBase):
         self.left_card.setTexTransform(self.left_mask_stage, self.mask_transform)
         self.right_card.setTexTransform(self.right_mask_stage, self.mask_transform)
 
-        # Left texture
-        self.left_card.setTexScale(self.left_texture_stage, 1 / self.scale)
-        self.left_card.setTexRotate(self.left_texture_stage, self.left_angle)
+        # Textures, one state each replaces the last stimulus' offset as well
+        texture_scale = (self._inv_scale, self._inv_scale)
+        self.left_card.setTexTransform(
+            self.left_texture_stage,
+            TransformState.makePosRotateScale2d((0, 0), self.left_angle, texture_scale),
+        )
+        self.right_card.setTexTransform(
+            self.right_texture_stage,
+            TransformState.makePosRotateScale2d(
+                (0, 0), self.right_angle, texture_scale
+            ),
+        )
 
-        # Right texture
-        self.right_card.setTexScale(self.right_texture_stage, 1 / self.scale)
-        self.right_card.setTexRotate(self.right_texture_stage, self.right_angle)
+        self.left_card.show()
+        self.right_card.show()
+
+        # per-frame thresholds for each side, fetched once per stimulus
+        self._left_thresholds, self._right_thresholds = (
+            task_thresholds(
+                self.current_stimulus.stationary_time[side],
+                self.current_stimulus.duration[side],
+                self.current_stimulus.hold_after[side],
+            )
+            for side in (0, 1)
+        )
+        self._final_time = float(max(self.current_stimulus.duration))
+        # binocular textures drift at twice the stimulus velocity
+        self._left_velocity = self.current_stimulus.velocity[0] * 2
+        self._right_velocity = self.current_stimulus.velocity[1] * 2
 
         # start the movement once everything is set up
         self.taskMgr.add(self.move_binocular, "move_binocular")
 
     def move_binocular(self, move_binocular_task):
+        time = move_binocular_task.time
+
         ### LEFT SIDE ###
-        if move_binocular_task.time <= self.current_stimulus.stationary_time[0]:
-            new_position_left = 0
-        elif move_binocular_task.time >= self.current_stimulus.duration[0] != -1:
-            if self.default_params["hold_onfinish"]:
-                new_position_left = self.new_position[0]
-            else:
-                self.left_card.detach_node()
-                new_position_left = None
-        elif (
-            not np.isnan(self.current_stimulus.hold_after[0])
-            and move_binocular_task.time >= self.current_stimulus.hold_after[0]
-        ):
-            new_position_left = self.new_position[0]
-        else:
-            new_position_left = (
-                -move_binocular_task.time * self.current_stimulus.velocity[0] * 2
-            )
+        stationary_time, end_time, hold_after, moving_until = self._left_thresholds
+        if stationary_time < time < moving_until:
+            new_position_left = -time * self._left_velocity
             self.left_card.setTexPos(
                 self.left_texture_stage,
                 new_position_left + self.center_x,
                 self.center_y,
                 0,
             )  # u, v, w
-
-        ### RIGHT SIDE ###
-        if move_binocular_task.time <= self.current_stimulus.stationary_time[1]:
-            new_position_right = 0
-        elif move_binocular_task.time >= self.current_stimulus.duration[1] != -1:
-            if self.default_params["hold_onfinish"]:
-                new_position_right = self.new_position[1]
+        elif time <= stationary_time:
+            new_position_left = 0
+        elif time >= end_time:
+            if self.hold_onfinish:
+                new_position_left = self.new_position[0]
             else:
-                self.right_card.detach_node()
-                new_position_right = None
-        elif (
-            not np.isnan(self.current_stimulus.hold_after[1])
-            and move_binocular_task.time >= self.current_stimulus.hold_after[1]
-        ):
-            new_position_right = self.new_position[1]
+                self.left_card.hide()
+                new_position_left = None
         else:
-            new_position_right = (
-                -move_binocular_task.time * self.current_stimulus.velocity[1] * 2
-            )
+            new_position_left = self.new_position[0]
+
+        ### RIGHT SIDE ###
+        stationary_time, end_time, hold_after, moving_until = self._right_thresholds
+        if stationary_time < time < moving_until:
+            new_position_right = -time * self._right_velocity
             self.right_card.setTexPos(
                 self.right_texture_stage,
                 new_position_right + self.center_x,
                 self.center_y,
                 0,
             )  # u, v, w
+        elif time <= stationary_time:
+            new_position_right = 0
+        elif time >= end_time:
+            if self.hold_onfinish:
+                new_position_right = self.new_position[1]
+            else:
+                self.right_card.hide()
+                new_position_right = None
+        else:
+            new_position_right = self.new_position[1]
 
         self.new_position = new_position_left, new_position_right
 
-        if move_binocular_task.time >= max(
-            self.current_stimulus.duration[0], self.current_stimulus.duration[1]
-        ):
+        if time >= self._final_time:
             self.clear_cards()
             return move_binocular_task.done
 
         return move_binocular_task.cont
 
     def clear_cards(self):
-        try:
-            self.card.detach_node()
-        except:
-            pass
-        try:
-            self.left_card.detach_node()
-        except:
-            pass
-        try:
-            self.right_card.detach_node()
-        except:
-            pass
+        self.card.hide()
+        self.left_card.hide()
+        self.right_card.hide()
 
         self.taskMgr.remove("move_monocular")
         self.taskMgr.remove("move_binocular")
@@ -323,12 +513,7 @@ class StimulusSequencing(ShowBase):
         self.mask_position_uv = (self.bin_center_x, self.bin_center_y)
 
         pos = 0.5 + self.mask_position_uv[0], 0.5 + self.mask_position_uv[1]
-        center_shift = TransformState.make_pos2d((-pos[0], -pos[1]))
-        scale = TransformState.make_scale2d(1 / self.scale)
-        rotate = TransformState.make_rotate2d(self.current_stimulus.strip_angle)
-        translate = TransformState.make_pos2d((0.5, 0.5))
-
-        return translate.compose(rotate.compose(scale.compose(center_shift)))
+        return mask_transform(pos, self.current_stimulus.strip_angle, self._inv_scale)
 
     def set_transforms(self):
         match self.current_stimulus:
@@ -356,25 +541,23 @@ class StimulusSequencing(ShowBase):
                 self.left_card.setTexTransform(
                     self.left_mask_stage, self.mask_transform
                 )
-                self.left_card.setTexScale(self.left_texture_stage, 1 / self.scale)
+                self.left_card.setTexScale(self.left_texture_stage, self._inv_scale)
                 self.left_card.setTexRotate(self.left_texture_stage, self.left_angle)
 
                 # Right texture
                 self.right_card.setTexTransform(
                     self.right_mask_stage, self.mask_transform
                 )
-                self.right_card.setTexScale(self.right_texture_stage, 1 / self.scale)
+                self.right_card.setTexScale(self.right_texture_stage, self._inv_scale)
                 self.right_card.setTexRotate(self.right_texture_stage, self.right_angle)
 
             case _:
-                print(
+                logging.warning(
                     f"{self.current_stimulus.__class__} -- Stimulus type not understood, transform failed"
                 )
 
     def buddy_task(self, buddytask):
-        self.buddy.position(self.new_position)
-        self.buddy.stimulus(self.current_stimulus)
-        self.buddy.broadcaster()
+        self.buddy.report(self.new_position, self.current_stimulus)
         return buddytask.cont
 
     def load_params(self, params_path):
@@ -401,7 +584,7 @@ class StimulusSequencing(ShowBase):
                 logging.error("no default parameters found")
 
         if not self.default_params:
-            self.logging.info("initializing non-loaded params")
+            logging.info("initializing non-loaded params")
             self.default_params = {
                 "rotation_offset": -90,
                 "window_size": [1024, 1024],
@@ -418,12 +601,15 @@ class StimulusSequencing(ShowBase):
             }
 
     def enable_params(self):
-        self.scale = np.sqrt(self.default_params["scale"])
+        self.scale = math.sqrt(self.default_params["scale"])
+        self._inv_scale = 1 / self.scale  # texture and mask stages scale down by this
         self.center_x = self.default_params["center"][0]
         self.center_y = self.default_params["center"][1]
         self.rotation_offset = self.default_params[
             "rotation_offset"
         ]  # rig / implementation specific offset
+        # read every frame once a binocular side has finished
+        self.hold_onfinish = self.default_params["hold_onfinish"]
         self.angle_rotation = 0  # for changing angles on the fly
         self.new_position = 0  # for tracking position on the fly
 
@@ -437,17 +623,17 @@ class StimulusSequencing(ShowBase):
         self.window_props.setSize(tuple(self.default_params["window_size"]))
 
         self.window_props.set_undecorated(self.default_params["window_undecorated"])
-        self.disable_mouse()
         self.window_props.set_foreground(self.default_params["window_foreground"])
         self.window_props.set_origin(tuple(self.default_params["window_position"]))
 
-        self.setBackgroundColor(0, 0, 0)  # this makes the background true black
+        open_window(self, self.window_props)
+        self.disable_mouse()
 
-        ShowBaseGlobal.base.win.requestProperties(self.window_props)
+        self.setBackgroundColor(0, 0, 0)  # this makes the background true black
 
         if self.default_params["profile_on"]:
             PStatClient.connect()
-            ShowBaseGlobal.base.setFrameRateMeter(True)
+            self.setFrameRateMeter(True)
 
 
 class OpenLoopStimulus(StimulusSequencing):
@@ -516,9 +702,7 @@ class SequencingWithPause(StimulusSequencing):
 
     def buddy_task(self, buddytask):
         self.buddy.pauseStatus(self.paused)
-        self.buddy.position(self.new_position)
-        self.buddy.stimulus(self.current_stimulus)
-        self.buddy.broadcaster()
+        self.buddy.report(self.new_position, self.current_stimulus)
         return buddytask.cont
 
 
@@ -543,7 +727,7 @@ class ExternalStimulus(SequencingWithPause):
             self.current_stimulus = stim_details
             self.set_stimulus()
         except:
-            print(f"failed to display {stim_details}")
+            logging.exception(f"failed to display {stim_details}")
 
     def buddy_task(self, buddytask):
         super().buddy_task(buddytask)
@@ -583,15 +767,15 @@ class TexMoving(ShowBase):
         profile=False,
         fps=60,
     ):
-        super().__init__()
+        super().__init__(windowType="none")
 
         self.stimulus_details = stimulus_details
         assert isinstance(
-            self.stimulus_details, stimtypes.MonocularStimulusDetails
+            self.stimulus_details, MonocularStimulusDetails
         ), "class must be monocular stimulus details"
 
         if window_size is None:
-            window_size = self.stimulus_details.texture_size
+            window_size = self.stimulus_details.texture.texture_size
         if not hasattr(window_size, "__iter__"):
             window_size = tuple([window_size, window_size])
         self.window_size = window_size
@@ -600,17 +784,17 @@ class TexMoving(ShowBase):
         ShowBaseGlobal.globalClock.setMode(ClockObject.MLimited)
         ShowBaseGlobal.globalClock.setFrameRate(fps)
 
-        # Set up profiling if desired
-        if profile:
-            PStatClient.connect()  # this will only work if pstats is running: see readme
-            ShowBaseGlobal.base.setFrameRateMeter(True)  # Show frame rate
-
         # Window properties set up
         self.window_properties = WindowProperties()
         self.window_properties.set_size(self.window_size)
 
         self.window_properties.setTitle(window_name)
-        ShowBaseGlobal.base.win.requestProperties(self.window_properties)
+        open_window(self, self.window_properties)
+
+        # Set up profiling if desired
+        if profile:
+            PStatClient.connect()  # this will only work if pstats is running: see readme
+            self.setFrameRateMeter(True)  # Show frame rate
 
         # Create scenegraph, attach stimulus to card.
         cm = CardMaker("card")
@@ -618,7 +802,7 @@ class TexMoving(ShowBase):
         self.card = self.aspect2d.attachNewNode(cm.generate())
 
         # Scale is so it can handle arbitrary rotations and shifts in binocular case
-        self.card.setScale(np.sqrt(8))
+        self.card.setScale(_SQRT8)
         self.card.setColor(
             (1, 1, 1, 1)
         )  # makes it bright when bright (default combination with card is add)
@@ -627,13 +811,22 @@ class TexMoving(ShowBase):
         self.card.setTexture(self.texture_stage, self.stimulus_details.texture.texture)
         self.card.setTexRotate(self.texture_stage, self.stimulus_details.angle)
 
+        # shifts smaller than a texel do not change the picture, skip re-setting those
+        self._texel = 1 / self.stimulus_details.texture.texture_size[0]
+        self._last_position = None
+
         if self.stimulus_details.velocity != 0:
             self.taskMgr.add(self.moveTextureTask, "moveTextureTask")
 
     def moveTextureTask(self, task):
-        new_position = -task.time * self.stimulus_details.velocity
-        self.card.setTexPos(self.texture_stage, new_position, 0, 0)  # u, v, w
-        return Task.cont
+        new_position = drift_offset(task.time, self.stimulus_details.velocity)
+        if (
+            self._last_position is None
+            or abs(new_position - self._last_position) >= self._texel
+        ):
+            self.card.setTexPos(self.texture_stage, new_position, 0, 0)  # u, v, w
+            self._last_position = new_position
+        return task.cont
 
 
 class BinocularMoving(ShowBase):
@@ -668,15 +861,15 @@ class BinocularMoving(ShowBase):
         profile=False,
         fps=60,
     ):
-        super().__init__()
+        super().__init__(windowType="none")
 
         self.stimulus_details = stimulus_details
         assert isinstance(
-            self.stimulus_details, stimtypes.BinocularStimulusDetails
+            self.stimulus_details, BinocularStimulusDetails
         ), "class must be binocular stimulus details"
 
         if window_size is None:
-            window_size = self.stimulus_details.texture_size
+            window_size = self.stimulus_details.texture[0].texture_size
         if not hasattr(window_size, "__iter__"):
             window_size = tuple([window_size, window_size])
         self.window_size = window_size
@@ -692,10 +885,17 @@ class BinocularMoving(ShowBase):
         ShowBaseGlobal.globalClock.setMode(ClockObject.MLimited)
         ShowBaseGlobal.globalClock.setFrameRate(fps)
 
+        # Window properties set up
+        self.window_properties = WindowProperties()
+        self.window_properties.set_size(self.window_size)
+
+        self.window_properties.setTitle(window_name)
+        open_window(self, self.window_properties)
+
         # Set up profiling if desired
         if profile:
             PStatClient.connect()  # this will only work if pstats is running
-            ShowBaseGlobal.base.setFrameRateMeter(True)  # Show frame rate
+            self.setFrameRateMeter(True)  # Show frame rate
             # Following will show a small x at the center
             self.title = OnscreenText(
                 "x",
@@ -706,77 +906,50 @@ class BinocularMoving(ShowBase):
                 scale=0.05,
             )
 
-        # Window properties set up
-        self.window_properties = WindowProperties()
-        self.window_properties.set_size(self.window_size)
-
-        self.window_properties.setTitle(window_name)
-        ShowBaseGlobal.base.win.requestProperties(self.window_properties)
-
-        # CREATE MASK ARRAYS
-        self.left_mask_array = 255 * np.ones(
-            self.stimulus_details.texture_size, dtype=np.uint8
+        # CREATE MASKS, shared with StimulusSequencing through the mask cache
+        (
+            self.left_mask_array,
+            self.right_mask_array,
+            self.left_mask,
+            self.right_mask,
+        ) = binocular_masks(
+            self.stimulus_details.texture[0].texture_size,
+            self.stimulus_details.texture[1].texture_size,
+            self.stimulus_details.strip_width,
         )
-        self.left_mask_array[
-            :,
-            self.stimulus_details.texture_size[1] // 2
-            - self.stimulus_details.strip_width // 2 :,
-        ] = 0
-        self.right_mask_array = 255 * np.ones(
-            self.stimulus_details.texture_size, dtype=np.uint8
-        )
-        self.right_mask_array[
-            :,
-            : self.stimulus_details.texture_size[1] // 2
-            + self.stimulus_details.strip_width // 2,
-        ] = 0
 
         # TEXTURE STAGES FOR LEFT CARD
         self.left_texture_stage = TextureStage("left_texture_stage")
-        # Mask
-        self.left_mask = Texture("left_mask_texture")
-        self.left_mask.setup2dTexture(
-            self.stimulus_details.texture_size[0],
-            self.stimulus_details.texture_size[1],
-            Texture.T_unsigned_byte,
-            Texture.F_luminance,
-        )
-        self.left_mask.setRamImage(self.left_mask_array)
-        self.left_mask_stage = TextureStage("left_mask_array")
-        # Multiply the texture stages together
-        self.left_mask_stage.setCombineRgb(
-            TextureStage.CMModulate,
-            TextureStage.CSTexture,
-            TextureStage.COSrcColor,
-            TextureStage.CSPrevious,
-            TextureStage.COSrcColor,
-        )
+        # Multiply the texture stages together, alpha is left to the texture below
+        self.left_mask_stage = modulate_stage("left_mask_array", keep_alpha=True)
         # TEXTURE STAGES FOR RIGHT CARD
         self.right_texture_stage = TextureStage("right_texture_stage")
-        # Mask
-        self.right_mask = Texture("right_mask_texture")
-        self.right_mask.setup2dTexture(
-            self.stimulus_details.texture_size[0],
-            self.stimulus_details.texture_size[1],
-            Texture.T_unsigned_byte,
-            Texture.F_luminance,
-        )
-        self.right_mask.setRamImage(self.right_mask_array)
+        # Multiply the texture stages together, a shared mask holds this side in alpha
         self.right_mask_stage = TextureStage("right_mask_stage")
-        # Multiply the texture stages together
         self.right_mask_stage.setCombineRgb(
             TextureStage.CMModulate,
             TextureStage.CSTexture,
-            TextureStage.COSrcColor,
+            (
+                TextureStage.COSrcAlpha
+                if self.right_mask is self.left_mask
+                else TextureStage.COSrcColor
+            ),
             TextureStage.CSPrevious,
             TextureStage.COSrcColor,
         )
+        self.right_mask_stage.setCombineAlpha(
+            TextureStage.CMReplace, TextureStage.CSPrevious, TextureStage.COSrcAlpha
+        )
         # CREATE CARDS/SCENEGRAPH
         cm = CardMaker("stimcard")
         cm.setFrameFullscreenQuad()
         # self.setBackgroundColor((0,0,0,1))
-        self.left_card = self.aspect2d.attachNewNode(cm.generate())
-        self.right_card = self.aspect2d.attachNewNode(cm.generate())
+        # both cards instance the same quad, render state lives on the card nodes
+        card_geom = NodePath(cm.generate())
+        self.left_card = self.aspect2d.attachNewNode("left_card")
+        self.right_card = self.aspect2d.attachNewNode("right_card")
+        card_geom.instanceTo(self.left_card)
+        card_geom.instanceTo(self.right_card)
         self.left_card.setAttrib(ColorBlendAttrib.make(ColorBlendAttrib.M_add))
         self.right_card.setAttrib(ColorBlendAttrib.make(ColorBlendAttrib.M_add))
 
@@ -794,61 +967,43 @@ class BinocularMoving(ShowBase):
         )  # without this the cards will appear washed out
 
         # TRANSFORMS
-        self.scale = np.sqrt(8)
+        self.scale = _SQRT8
+        self._inv_scale = 1 / _SQRT8
 
         # Masks
         self.mask_transform = self.trs_transform()
         self.left_card.setTexTransform(self.left_mask_stage, self.mask_transform)
         self.right_card.setTexTransform(self.right_mask_stage, self.mask_transform)
         # Left texture
-        self.left_card.setTexScale(self.left_texture_stage, 1 / self.scale)
+        self.left_card.setTexScale(self.left_texture_stage, self._inv_scale)
         self.left_card.setTexRotate(
             self.left_texture_stage, self.stimulus_details.angle[0]
         )
         # Right texture
-        self.right_card.setTexScale(self.right_texture_stage, 1 / self.scale)
+        self.right_card.setTexScale(self.right_texture_stage, self._inv_scale)
         self.right_card.setTexRotate(
             self.right_texture_stage, self.stimulus_details.angle[1]
         )
 
-        # Set dynamic transforms
-        self.taskMgr.add(self.textures_update, "move_both")
+        # Set dynamic transforms, only for the sides that drift
+        self.drifts = [
+            (card, stage, velocity, stationary_time)
+            for card, stage, velocity, stationary_time in zip(
+                (self.left_card, self.right_card),
+                (self.left_texture_stage, self.right_texture_stage),
+                self.stimulus_details.velocity,
+                self.stimulus_details.stationary_time,
+            )
+            if velocity != 0
+        ]
+        if self.drifts:
+            self.taskMgr.add(self.textures_update, "move_both")
 
-    # Move both textures
+    # Move both textures, each side once its stationary time is up
     def textures_update(self, task):
-        if self.stimulus_details.velocity[0] == 0:
-            pass
-        elif self.stimulus_details.stationary_time[0] == 0:
-            left_tex_position = (
-                -task.time * self.stimulus_details.velocity[0]
-            )  # negative b/c texture stage
-            self.left_card.setTexPos(self.left_texture_stage, left_tex_position, 0, 0)
-        else:
-            if task.time >= self.stimulus_details.stationary_time[0]:
-                left_tex_position = (
-                    -task.time * self.stimulus_details.velocity[0]
-                )  # negative b/c texture stage
-                self.left_card.setTexPos(
-                    self.left_texture_stage, left_tex_position, 0, 0
-                )
-
-        if self.stimulus_details.velocity[1] == 0:
-            pass
-        elif self.stimulus_details.stationary_time[1] == 0:
-            right_tex_position = (
-                -task.time * self.stimulus_details.velocity[1]
-            )  # negative b/c texture stage
-            self.right_card.setTexPos(
-                self.right_texture_stage, right_tex_position, 0, 0
-            )
-        else:
-            if task.time >= self.stimulus_details.stationary_time[1]:
-                right_tex_position = (
-                    -task.time * self.stimulus_details.velocity[1]
-                )  # negative b/c texture stage
-                self.right_card.setTexPos(
-                    self.right_texture_stage, right_tex_position, 0, 0
-                )
+        for card, stage, velocity, stationary_time in self.drifts:
+            if task.time >= stationary_time:
+                card.setTexPos(stage, drift_offset(task.time, velocity), 0, 0)
         return task.cont
 
     def trs_transform(self):
@@ -857,11 +1012,7 @@ class BinocularMoving(ShowBase):
         rdb contributed to this code
         """
         pos = 0.5 + self.mask_position_uv[0], 0.5 + self.mask_position_uv[1]
-        center_shift = TransformState.make_pos2d((-pos[0], -pos[1]))
-        scale = TransformState.make_scale2d(1 / self.scale)
-        rotate = TransformState.make_rotate2d(self.stimulus_details.strip_angle)
-        translate = TransformState.make_pos2d((0.5, 0.5))
-        return translate.compose(rotate.compose(scale.compose(center_shift)))
+        return mask_transform(pos, self.stimulus_details.strip_angle, self._inv_scale)
 
 
 ### ENDS EXAMPLE CLASSES ###
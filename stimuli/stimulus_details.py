@@ -5,13 +5,24 @@ defines strict parameters for stimuli to follow according to defined type -- fak
 
 Part of pandastim package: https://github.com/mattdloring/pandastim
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cache
 
 import numpy as np
 
 from pandastim import utils
 
 
+@cache
+def default_texture():
+    """
+    default grating, built on first use rather than on import and then shared
+    """
+    from pandastim.stimuli import textures
+
+    return textures.GratingGrayTex()
+
+
 @dataclass(frozen=True)
 class StimulusDetails:
     """Contains details about a given stimulus"""
@@ -144,7 +155,7 @@ class MonocularStimulusDetails(StimulusDetails):
     hold_after: float = np.nan
 
     # default texture is a grating, because why not
-    texture: textures.TextureBase = textures.GratingGrayTex()
+    texture: textures.TextureBase = field(default_factory=default_texture)
     stim_name: str = f"wholefield-stimulus_{velocity}_{angle}"
 
     # default master for monocular stimuli -- can be passed in local usages
@@ -194,9 +205,8 @@ class BinocularStimulusDetails(StimulusDetails):
     position: tuple = (0, 0)
     strip_angle: int = 0
 
-    texture: tuple = (
-        textures.GratingGrayTex(),
-        textures.GratingGrayTex(),
+    texture: tuple = field(
+        default_factory=lambda: (default_texture(), default_texture())
     )
     stim_name: str = f"binocular-stimulus_{velocity}_{angle}"
 
@@ -266,15 +276,15 @@ def legacy2current(stim_df, tex="grating_gray", duration=15, stationary_time=10)
     texDict = {"texture_name": "grating_gray", "frequency": 48}
     createdTexture = utils.createTexture(texDict)
     createdTextures = (createdTexture, createdTexture)  # assumes same textures
+    # signatures are fixed, look them up once rather than per row and key
+    binocular_parameters = set(inspect.signature(BinocularStimulusDetails).parameters)
+    monocular_parameters = set(inspect.signature(MonocularStimulusDetails).parameters)
     stimSequence = []
-    for row_n in range(len(stim_df)):
-        row = stim_df.iloc[row_n]
-        stimDict = dict(row)
+    # one conversion for the whole frame rather than a Series per iloc row
+    for stimDict in stim_df.to_dict("records"):
         if hasattr(stimDict["angle"], "__iter__"):
             detail_dict = {
-                k: v
-                for k, v in stimDict.items()
-                if k in list(inspect.signature(BinocularStimulusDetails).parameters)
+                k: v for k, v in stimDict.items() if k in binocular_parameters
             }
 
             detail_dict["duration"] = (duration, duration)
@@ -282,9 +292,7 @@ def legacy2current(stim_df, tex="grating_gray", duration=15, stationary_time=10)
             stimulus = BinocularStimulusDetails(texture=createdTextures, **detail_dict)
         else:
             detail_dict = {
-                k: v
-                for k, v in stimDict.items()
-                if k in list(inspect.signature(MonocularStimulusDetails).parameters)
+                k: v for k, v in stimDict.items() if k in monocular_parameters
             }
             detail_dict["duration"] = duration
             detail_dict["stationary_time"] = stationary_time
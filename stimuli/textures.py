@@ -31,6 +31,12 @@ from panda3d.core import Texture
 
 from pandastim import utils
 
+# panda3d component type and rgba format for each texture array dtype
+_component_types = {
+    np.dtype(np.uint8): (Texture.T_unsigned_byte, Texture.F_rgba8),
+    np.dtype(np.uint16): (Texture.T_unsigned_short, Texture.F_rgba16),
+}
+
 
 class TextureBase(ABC):
     """
@@ -38,6 +44,10 @@ class TextureBase(ABC):
     Requires implementation of create_texture and __str__
     """
 
+    # textures that are constant down the columns only upload their first row,
+    # a 1 texel high image samples the same for any v
+    separable = False
+
     def __init__(self, texture_size=512, texture_name="texture"):
         """
         :param texture_size: tuple size for texture
@@ -49,27 +59,51 @@ class TextureBase(ABC):
 
         self.texture_size = texture_size
         self.texture_name = texture_name
-        self.texture_array = self.create_texture()
+        # packed and in native byte order, so panda3d copies the image in one go
+        texture_array = self.create_texture()
+        native_dtype = texture_array.dtype.newbyteorder("=")
+        if self.separable:
+            # only the first row is packed, the full image stays a broadcast view of it
+            image = np.ascontiguousarray(texture_array[:1], dtype=native_dtype)
+            self.texture_array = np.broadcast_to(image, texture_array.shape)
+            image_height = 1
+        else:
+            self.texture_array = np.ascontiguousarray(texture_array, dtype=native_dtype)
+            image, image_height = self.texture_array, self.texture_size[1]
 
         self.texture = Texture(self.texture_name)
 
+        component_types = _component_types.get(self.texture_array.dtype)
+        if component_types is None:
+            raise ValueError(
+                f"texture arrays must be uint8 or uint16, not {self.texture_array.dtype}"
+            )
+        component_type, rgba_format = component_types
+
         # Set texture formatting (greyscale or rgb have different settings)
-        if self.texture_array.ndim == 2:
+        if image.ndim == 2:
             self.texture.setup2dTexture(
                 self.texture_size[0],
-                self.texture_size[1],
-                Texture.T_unsigned_byte,
+                image_height,
+                component_type,
                 Texture.F_luminance,
             )
-            self.texture.setRamImageAs(self.texture_array, "L")
-        elif self.texture_array.ndim == 3:
+            self.texture.setRamImage(image)
+        elif image.ndim == 3:
+            # padded to opaque rgba, drivers repack 3 channel images on upload
+            # written in panda3d's native bgra order so it is taken as is
+            bgra = np.empty(image.shape[:2] + (4,), dtype=image.dtype)
+            bgra[..., :3] = image[..., ::-1]
+            bgra[..., 3] = np.iinfo(image.dtype).max
             self.texture.setup2dTexture(
                 self.texture_size[0],
-                self.texture_size[1],
-                Texture.T_unsigned_byte,
-                Texture.F_rgb8,
+                image_height,
+                component_type,
+                rgba_format,
             )
-            self.texture.setRamImageAs(self.texture_array, "RGB")
+            self.texture.setRamImage(bgra)
+
+        utils.async_transfer(self.texture)
 
     @abstractmethod
     def create_texture(self) -> None:
@@ -169,22 +203,13 @@ class CircleGrayTex(TextureBase):
         if self.fg_intensity > 255 or self.bg_intensity < 0:
             raise ValueError("Circle intensity must lie in [0, 255]")
 
-        x = np.linspace(
-            -self.texture_size[0] / 2, self.texture_size[0] / 2, self.texture_size[0]
+        return utils.circle_texture(
+            self.texture_size,
+            center=self.circle_center,
+            radius=self.circle_radius,
+            bg_value=self.bg_intensity,
+            fg_value=self.fg_intensity,
         )
-        y = np.linspace(
-            -self.texture_size[1] / 2, self.texture_size[1] / 2, self.texture_size[1]
-        )
-        X, Y = np.meshgrid(x, y)
-
-        circle_texture = self.bg_intensity * np.ones(
-            (self.texture_size[0], self.texture_size[1]), dtype=np.uint8
-        )
-        circle_mask = (X - self.circle_center[0]) ** 2 + (
-            Y - self.circle_center[1]
-        ) ** 2 <= self.circle_radius**2
-        circle_texture[circle_mask] = self.fg_intensity
-        return np.uint8(circle_texture)
 
     def __str__(self) -> str:
         return (
@@ -198,15 +223,17 @@ class SinGrayTex(TextureBase):
     Grayscale sinusoidal grating texture.
     """
 
+    separable = True
+
     def __init__(self, frequency=10, texture_name="sin_gray", *args, **kwargs):
         self.frequency = frequency
         super().__init__(texture_name=texture_name, *args, **kwargs)
 
     def create_texture(self) -> np.array:
-        x = np.linspace(0, 2 * np.pi, self.texture_size[0] + 1)
-        y = np.linspace(0, 2 * np.pi, self.texture_size[1] + 1)
-        array, Y = np.meshgrid(x[: self.texture_size[0]], y[: self.texture_size[1]])
-        return utils.sin_byte(array, freq=self.frequency)
+        # sinusoid only varies along x: build one row and broadcast it down the columns
+        x = np.linspace(0, 2 * np.pi, self.texture_size[0] + 1, dtype=np.float32)
+        row = utils.sin_byte(x[None, : self.texture_size[0]], freq=self.frequency)
+        return np.broadcast_to(row, (self.texture_size[1], self.texture_size[0]))
 
     def __str__(self) -> str:
         return (
@@ -219,6 +246,8 @@ class SinRgbTex(TextureBase):
     Sinusoid that goes from black to the given rgb value.
     """
 
+    separable = True
+
     def __init__(
         self, color=(255, 0, 0), frequency=10, texture_name="sin_rgb", *args, **kwargs
     ):
@@ -233,19 +262,14 @@ class SinRgbTex(TextureBase):
             raise ValueError(
                 "SinRgbTex.sin_texture_rgb(): rgb values must lie in [0,255]"
             )
-        x = np.linspace(0, 2 * np.pi, self.texture_size[0] + 1)
-        y = np.linspace(0, 2 * np.pi, self.texture_size[1] + 1)
-        array, Y = np.meshgrid(x[: self.texture_size[0]], y[: self.texture_size[1]])
-        R = np.uint8((self.color[0] / 255) * utils.sin_byte(array, freq=self.frequency))
-        G = np.uint8((self.color[1] / 255) * utils.sin_byte(array, freq=self.frequency))
-        B = np.uint8((self.color[2] / 255) * utils.sin_byte(array, freq=self.frequency))
-        rgb_sin = np.zeros(
-            (self.texture_size[1], self.texture_size[0], 3), dtype=np.uint8
-        )
-        rgb_sin[..., 0] = R
-        rgb_sin[..., 1] = G
-        rgb_sin[..., 2] = B
-        return rgb_sin
+        x = np.linspace(0, 2 * np.pi, self.texture_size[0] + 1, dtype=np.float32)
+        row = utils.sin_byte(x[None, : self.texture_size[0]], freq=self.frequency)
+        R = np.uint8((self.color[0] / 255) * row)
+        G = np.uint8((self.color[1] / 255) * row)
+        B = np.uint8((self.color[2] / 255) * row)
+        # one rgb row, broadcast down the columns
+        rgb_sin = np.stack([R, G, B], axis=-1)
+        return np.broadcast_to(rgb_sin, (self.texture_size[1], self.texture_size[0], 3))
 
     def __str__(self) -> str:
         return f"{type(self).__name__} size:{self.texture_size} frequency:{self.frequency} rgb:{self.color}"
@@ -256,6 +280,8 @@ class GratingGrayTex(TextureBase):
     Grayscale 2d square wave (grating)
     """
 
+    separable = True
+
     def __init__(
         self,
         frequency=10,
@@ -271,13 +297,15 @@ class GratingGrayTex(TextureBase):
         super().__init__(texture_name=texture_name, *args, **kwargs)
 
     def create_texture(self) -> np.array:
-        x = np.linspace(0, 2 * np.pi, self.texture_size[0] + 1)
-        y = np.linspace(0, 2 * np.pi, self.texture_size[1] + 1)
-        X, Y = np.meshgrid(x[: self.texture_size[0]], y[: self.texture_size[1]])
-        tex = utils.grating_byte(X, freq=self.frequency)
-        tex[tex == 0] = self.dark_value
-        tex[tex == 255] = self.light_value
-        return tex
+        # columns are constant, so only a single row is built
+        width, height = self.texture_size
+        x = np.linspace(0, 2 * np.pi, width + 1)[:width]
+        row = np.where(
+            utils.grating_byte(x, freq=self.frequency) == 255,
+            self.light_value,
+            self.dark_value,
+        ).astype(np.uint8)
+        return np.broadcast_to(row, (height, width))
 
     def __str__(self) -> str:
         return (
@@ -290,6 +318,8 @@ class GratingRgbTex(TextureBase):
     Rgb 2d square wave (grating) stimulus class (goes from black to rgb val)
     """
 
+    separable = True
+
     def __init__(
         self,
         color=(255, 0, 0),
@@ -310,24 +340,15 @@ class GratingRgbTex(TextureBase):
                 "SinRgbTex.sin_texture_rgb(): rgb values must lie in [0,255]"
             )
         x = np.linspace(0, 2 * np.pi, self.texture_size[0] + 1)
-        y = np.linspace(0, 2 * np.pi, self.texture_size[1] + 1)
-        array, Y = np.meshgrid(x[: self.texture_size[0]], y[: self.texture_size[1]])
-        R = np.uint8(
-            (self.color[0] / 255) * utils.grating_byte(array, freq=self.frequency)
+        row = utils.grating_byte(x[None, : self.texture_size[0]], freq=self.frequency)
+        R = np.uint8((self.color[0] / 255) * row)
+        G = np.uint8((self.color[1] / 255) * row)
+        B = np.uint8((self.color[2] / 255) * row)
+        # one rgb row, broadcast down the columns
+        rgb_grating = np.stack([R, G, B], axis=-1)
+        return np.broadcast_to(
+            rgb_grating, (self.texture_size[1], self.texture_size[0], 3)
         )
-        G = np.uint8(
-            (self.color[1] / 255) * utils.grating_byte(array, freq=self.frequency)
-        )
-        B = np.uint8(
-            (self.color[2] / 255) * utils.grating_byte(array, freq=self.frequency)
-        )
-        rgb_grating = np.zeros(
-            (self.texture_size[1], self.texture_size[0], 3), dtype=np.uint8
-        )
-        rgb_grating[..., 0] = R
-        rgb_grating[..., 1] = G
-        rgb_grating[..., 2] = B
-        return rgb_grating
 
     def __str__(self) -> str:
         return f"{type(self).__name__} size:{self.texture_size} frequency:{self.frequency} rgb:{self.color}"
@@ -400,8 +421,18 @@ class RadialSinCube(TextureBase):
         super().__init__(texture_name=texture_name, *args, **kwargs)
 
     def create_texture(self) -> np.array:
-        x = np.linspace(-self.period * np.pi, self.period * np.pi, self.texture_size[0])
-        y = np.linspace(-self.period * np.pi, self.period * np.pi, self.texture_size[1])
+        x = np.linspace(
+            -self.period * np.pi,
+            self.period * np.pi,
+            self.texture_size[0],
+            dtype=np.float32,
+        )
+        y = np.linspace(
+            -self.period * np.pi,
+            self.period * np.pi,
+            self.texture_size[1],
+            dtype=np.float32,
+        )
         return np.round(
             (2 * np.pi / self.period)
             * np.sin(np.sqrt(x[None, :] ** 2 + y[:, None] ** 2) + self.phase)
@@ -6,18 +6,20 @@ Helper functions used in multiple classes in stimulu/textures
 Part of pandastim package: https://github.com/mattdloring/pandastim
 """
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime as dt
 
 import numpy as np
 import zmq
-from scipy import signal
 
 
 def sin_byte(X: np.array, freq: int = 1) -> np.array:
     """
     Creates unsigned 8 bit representation of sin (T_unsigned_Byte).
     """
-    sin_float = np.sin(freq * X)
+    # single precision is plenty for 8 bit output and halves the temporaries
+    sin_float = np.sin(np.float32(freq) * np.asarray(X, dtype=np.float32))
 
     # from 0-255
     sin_transformed = (sin_float + 1) * 127.5
@@ -28,11 +30,39 @@ def grating_byte(X: np.array, freq: int = 1) -> np.array:
     """
     Unsigned 8 bit representation of a grating (square wave)
     """
-    grating_float = signal.square(X * freq)
-
-    # from 0-255
-    grating_transformed = (grating_float + 1) * 127.5
-    return np.uint8(grating_transformed)
+    # high for the first half of each period, written straight to 0/255 bytes
+    return np.where(np.mod(X * freq, 2 * np.pi) < np.pi, 255, 0).astype(
+        np.uint8, copy=False
+    )
+
+
+def circle_texture(
+    texture_size: tuple,
+    center: tuple = (0, 0),
+    radius: float = 100,
+    bg_value: int = 0,
+    fg_value: int = 255,
+) -> np.array:
+    """
+    Unsigned 8 bit (height, width) filled circle, from an open grid
+    """
+    width, height = texture_size
+    x = np.linspace(-width / 2, width / 2, width)
+    y = np.linspace(-height / 2, height / 2, height)
+    circle_texture = np.full((height, width), bg_value, dtype=np.uint8)
+    circle_mask = (x[None, :] - center[0]) ** 2 + (
+        y[:, None] - center[1]
+    ) ** 2 <= radius**2
+    circle_texture[circle_mask] = fg_value
+    return circle_texture
+
+
+def async_transfer(texture, num_buffers: int = 2) -> None:
+    """
+    Hand texture uploads to panda3d's transfer thread where supported (panda3d 1.11+)
+    """
+    if hasattr(texture, "setup_async_transfer"):
+        texture.setup_async_transfer(num_buffers)
 
 
 def card2uv(val: float) -> float:
@@ -98,6 +128,49 @@ def saving(file_path: str, append=False, *other_info) -> object:
     return filestream
 
 
+# textures built from parameter dicts, repeated stimuli reuse the uploaded texture
+# least recently used textures are dropped past the size bound
+TEXTURE_CACHE_SIZE = 32
+_texture_cache = OrderedDict()
+# buddy receive threads and the main thread share the cache
+_texture_cache_lock = threading.Lock()
+
+
+def cached_texture(texFxn, tex_dict: dict):
+    """
+    returns texFxn(**tex_dict), keeping the last TEXTURE_CACHE_SIZE distinct textures
+
+    parameters that can't be hashed (nested lists, dicts, arrays) are built uncached
+    """
+    key = (
+        texFxn,
+        tuple(
+            sorted(
+                (k, tuple(v) if isinstance(v, list) else v) for k, v in tex_dict.items()
+            )
+        ),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return texFxn(**tex_dict)
+
+    with _texture_cache_lock:
+        texture = _texture_cache.get(key)
+        if texture is not None:
+            _texture_cache.move_to_end(key)
+            return texture
+
+    # built outside the lock, a texture racing in from another thread wins
+    texture = texFxn(**tex_dict)
+    with _texture_cache_lock:
+        texture = _texture_cache.setdefault(key, texture)
+        _texture_cache.move_to_end(key)
+        while len(_texture_cache) > TEXTURE_CACHE_SIZE:
+            _texture_cache.popitem(last=False)
+    return texture
+
+
 def create_tex(input_tex_dict: dict):
     """
     this one works with the tex_ flag header
@@ -118,14 +191,12 @@ def create_tex(input_tex_dict: dict):
         "radial_sin_centering": textures.RadialSinCube,
     }
     texFxn = texture_map_dict[input_tex_dict["tex_texture_name"]]
+    tex_parameters = set(inspect.signature(texFxn).parameters) | set(
+        inspect.signature(textures.TextureBase).parameters
+    )
     # 4: to take off the 'tex_' we added earlier
-    tex_dict = {
-        k[4:]: v
-        for k, v in input_tex_dict.items()
-        if k[4:] in list(inspect.signature(texFxn).parameters)
-        or k[4:] in list(inspect.signature(textures.TextureBase).parameters)
-    }
-    return texFxn(**tex_dict)
+    tex_dict = {k[4:]: v for k, v in input_tex_dict.items() if k[4:] in tex_parameters}
+    return cached_texture(texFxn, tex_dict)
 
 
 def createTexture(input_tex_dict: dict):
@@ -148,14 +219,12 @@ def createTexture(input_tex_dict: dict):
         "radial_sin_centering": textures.RadialSinCube,
     }
     texFxn = texture_map_dict[input_tex_dict["texture_name"]]
+    tex_parameters = set(inspect.signature(texFxn).parameters) | set(
+        inspect.signature(textures.TextureBase).parameters
+    )
 
-    tex_dict = {
-        k: v
-        for k, v in input_tex_dict.items()
-        if k in list(inspect.signature(texFxn).parameters)
-        or k in list(inspect.signature(textures.TextureBase).parameters)
-    }
-    return texFxn(**tex_dict)
+    tex_dict = {k: v for k, v in input_tex_dict.items() if k in tex_parameters}
+    return cached_texture(texFxn, tex_dict)
 
 
 def legacy2current(
@@ -169,15 +238,15 @@ def legacy2current(
     texDict = {"texture_name": tex, "frequency": frequency}
     createdTexture = createTexture(texDict)
     createdTextures = (createdTexture, createdTexture)
+    # signatures are fixed, look them up once rather than per row and key
+    binocular_parameters = set(inspect.signature(BinocularStimulusDetails).parameters)
+    monocular_parameters = set(inspect.signature(MonocularStimulusDetails).parameters)
     stimSequence = []
-    for row_n in range(len(stim_df)):
-        row = stim_df.iloc[row_n]
-        stimDict = dict(row)
+    # one conversion for the whole frame rather than a Series per iloc row
+    for stimDict in stim_df.to_dict("records"):
         if hasattr(stimDict["angle"], "__iter__"):
             detail_dict = {
-                k: v
-                for k, v in stimDict.items()
-                if k in list(inspect.signature(BinocularStimulusDetails).parameters)
+                k: v for k, v in stimDict.items() if k in binocular_parameters
             }
 
             detail_dict["duration"] = (duration, duration)
@@ -186,9 +255,7 @@ def legacy2current(
         else:
             stimDict["velocity"] = float(stimDict["velocity"])
             detail_dict = {
-                k: v
-                for k, v in stimDict.items()
-                if k in list(inspect.signature(MonocularStimulusDetails).parameters)
+                k: v for k, v in stimDict.items() if k in monocular_parameters
             }
             detail_dict["duration"] = duration
             detail_dict["stationary_time"] = stationary_time